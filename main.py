@@ -1,29 +1,123 @@
 import sys
-from collections import deque
+
+import numpy as np
+from scipy.sparse import csr_matrix
+
+try:
+    from numba import njit
+except ImportError:  # Sans Numba, les noyaux s'exécutent en Python pur
+    def njit(*args, **kwargs):
+        if args and callable(args[0]):
+            return args[0]
+        return lambda func: func
+
+MAX_CHEMINS_CRITIQUES = 1000  # Nombre maximal de chemins critiques énumérés
+INFINI = np.iinfo(np.int64).max >> 1  # Date au plus tard d'un sommet qui n'atteint pas ω
+
+@njit(cache=True)
+def _kahn_longest(indptr, indices, data, n):
+    """Tri topologique de Kahn, rangs et calendrier au plus tôt (ordre partiel si circuit)"""
+    in_degree = np.zeros(n, np.int32)
+    for idx in range(indptr[n]):
+        in_degree[indices[idx]] += 1
+    
+    # File des points d'entrée : tableau préalloué, chaque sommet y entre au plus une fois
+    queue = np.empty(n, np.int32)
+    head = 0
+    tail = 0
+    for i in range(n):
+        if in_degree[i] == 0:
+            queue[tail] = i
+            tail += 1
+    
+    early = np.zeros(n, np.int64)
+    ranks = np.zeros(n, np.int32)
+    while head < tail:
+        u = queue[head]
+        head += 1
+        for idx in range(indptr[u], indptr[u + 1]):
+            v = indices[idx]
+            if early[v] < early[u] + data[idx]:
+                early[v] = early[u] + data[idx]
+            if ranks[v] < ranks[u] + 1:
+                ranks[v] = ranks[u] + 1
+            in_degree[v] -= 1
+            if in_degree[v] == 0:
+                queue[tail] = v
+                tail += 1
+    
+    return queue[:tail], early, ranks
+
+@njit(cache=True)
+def _late_from_topo(indptr_rev, indices_rev, data_rev, topo, omega, total):
+    """Calendrier au plus tard en parcourant l'ordre topologique à l'envers"""
+    late = np.full(len(indptr_rev) - 1, INFINI, np.int64)
+    late[omega] = total
+    
+    for k in range(len(topo) - 1, -1, -1):
+        v = topo[k]
+        if late[v] == INFINI:  # v n'atteint pas ω : rien à propager
+            continue
+        for idx in range(indptr_rev[v], indptr_rev[v + 1]):
+            u = indices_rev[idx]
+            if late[u] > late[v] - data_rev[idx]:
+                late[u] = late[v] - data_rev[idx]
+    
+    return late
 
 class Ordonnancement:
     def __init__(self):
-        self.tasks = {}  # Dictionnaire des tâches: {num: (durée, [prédécesseurs])}
-        self.matrix = None  # Matrice d'adjacence du graphe
+        self.task_ids = None  # Numéros des tâches (int64), dans l'ordre du fichier
+        self.durations = None  # Durées des tâches (int64), alignées sur task_ids
+        self.pred_indptr = None  # Début des prédécesseurs de chaque tâche dans pred_indices
+        self.pred_indices = None  # Prédécesseurs de toutes les tâches, bout à bout (int64)
+        self.csr = None  # Graphe au format CSR (arcs pondérés par les durées)
+        self.indptr = None  # Début des successeurs de chaque sommet dans indices/data
+        self.indices = None  # Successeurs (int32)
+        self.data = None  # Valeurs des arcs (int64)
+        self.rows = None  # Origine de chaque arc, alignée sur indices/data
+        self._topo = None  # Ordre d'élimination de Kahn (cache, partiel si circuit)
+        self._early = None  # Calendrier au plus tôt (cache)
+        self._ranks = None  # Rangs des sommets (cache)
+        self._cache_valid = False
+        self._csr_rev = None  # Graphe inversé au format CSR (cache)
         self.n = 0  # Nombre de tâches réelles
         self.alpha = 0  # Tâche fictive début (0)
         self.omega = 0  # Tâche fictive fin (n+1)
+        self.verbose = False  # Affiche chaque étape de l'élimination des points d'entrée
         
     def lire_fichier(self, filename):
         """Lit un fichier texte contenant le tableau de contraintes"""
         try:
-            with open(filename, 'r') as f:
-                lines = f.readlines()
+            with open(filename, 'rb') as f:
+                raw = f.read()
+            
+            # Première passe : analyser chaque ligne pour dimensionner les tableaux
+            lines = [np.fromstring(line, dtype=np.int64, sep=' ') for line in raw.split(b'\n') if line.strip()]
+            lengths = np.array([len(parts) for parts in lines], dtype=np.int64)
+            if (lengths < 2).any():
+                raise ValueError("chaque ligne doit contenir au moins un numéro de tâche et une durée")
+            
+            # Seconde passe : remplir les tableaux (numéro, durée, prédécesseurs)
+            flat = np.concatenate(lines) if lines else np.empty(0, dtype=np.int64)
+            # np.fromstring sature les nombres trop grands au lieu d'échouer
+            if ((flat >= INFINI) | (flat <= -INFINI)).any():
+                raise ValueError("valeur hors limites dans le tableau de contraintes")
+            starts = np.cumsum(lengths) - lengths
+            task_ids = flat[starts]
+            if len(np.unique(task_ids)) != len(task_ids):
+                raise ValueError("une tâche est définie plusieurs fois")
             
-            self.tasks = {}
-            for line in lines:
-                parts = list(map(int, line.strip().split()))
-                task_num = parts[0]
-                duration = parts[1]
-                predecessors = parts[2:] if len(parts) > 2 else []
-                self.tasks[task_num] = (duration, predecessors)
+            is_pred = np.ones(len(flat), dtype=bool)
+            is_pred[starts] = False
+            is_pred[starts + 1] = False
             
-            self.n = len(self.tasks)
+            self.task_ids = task_ids
+            self.durations = flat[starts + 1]
+            self.pred_indptr = np.concatenate([[0], np.cumsum(lengths - 2)])
+            self.pred_indices = flat[is_pred]
+            
+            self.n = len(task_ids)
             self.omega = self.n + 1
             return True
         except FileNotFoundError:
@@ -34,86 +128,102 @@ class Ordonnancement:
             return False
     
     def construire_graphe(self):
-        """Construit la matrice d'adjacence du graphe avec α et ω"""
+        """Construit le graphe au format CSR avec α et ω"""
         size = self.n + 2  # 0 à n+1
-        self.matrix = [[None for _ in range(size)] for _ in range(size)]
+        task_ids = self.task_ids
         
-        # Initialiser tous les arcs comme inexistants (None)
-        for i in range(size):
-            for j in range(size):
-                self.matrix[i][j] = None
+        # Durées indexées par numéro de sommet (les sommets sont les numéros de tâche)
+        durations = np.zeros(size, dtype=np.int64)
+        durations[task_ids] = self.durations
+        counts = np.diff(self.pred_indptr)
         
         # Ajouter les arcs depuis α (0) vers les tâches sans prédécesseurs
-        for task in self.tasks:
-            if not self.tasks[task][1]:  # Pas de prédécesseurs
-                self.matrix[self.alpha][task] = 0
+        start_cols = task_ids[counts == 0]
         
-        # Ajouter les arcs entre les tâches
-        for task in self.tasks:
-            duration, predecessors = self.tasks[task]
-            for pred in predecessors:
-                self.matrix[pred][task] = self.tasks[pred][0]  # Durée de la tâche prédécesseur
+        # Ajouter les arcs entre les tâches (valeur = durée de la tâche prédécesseur),
+        # un prédécesseur répété ne donne qu'un arc
+        keys = np.unique(self.pred_indices.astype(np.int64) * size + np.repeat(task_ids, counts))
+        pred_rows = (keys // size).astype(np.int32)
+        pred_cols = (keys % size).astype(np.int32)
         
         # Ajouter les arcs vers ω (n+1) depuis les tâches sans successeurs
-        for i in range(size):
-            has_successor = any(self.matrix[i][j] is not None for j in range(size))
-            if i != self.omega and not has_successor and i in self.tasks:
-                self.matrix[i][self.omega] = self.tasks[i][0]
+        has_succ = np.zeros(size, dtype=bool)
+        has_succ[pred_rows] = True
+        end_rows = task_ids[~has_succ[task_ids] & (task_ids != self.omega)]
+        
+        rows = np.concatenate([np.full(len(start_cols), self.alpha, dtype=np.int32), pred_rows, end_rows])
+        cols = np.concatenate([start_cols, pred_cols, np.full(len(end_rows), self.omega, dtype=np.int32)])
+        durs = np.concatenate([np.zeros(len(start_cols), dtype=np.int64), durations[pred_rows], durations[end_rows]])
+        
+        self.csr = csr_matrix((durs, (rows, cols)), shape=(size, size), dtype=np.int64)
+        self.indptr = self.csr.indptr
+        self.indices = self.csr.indices
+        self.data = self.csr.data
+        self.rows = np.repeat(np.arange(size, dtype=np.int32), np.diff(self.indptr))
+        self._cache_valid = False
+        self._csr_rev = None
+    
+    def _ensure_topo(self):
+        """Calcule une seule fois l'ordre topologique, les rangs et le calendrier au plus tôt"""
+        if self._cache_valid:
+            return
+        
+        size = self.n + 2
+        self._topo, self._early, self._ranks = _kahn_longest(self.indptr, self.indices, self.data, size)
+        self._cache_valid = True
+    
+    def _ensure_rev_csr(self):
+        """Construit une seule fois le graphe inversé (prédécesseurs) au format CSR"""
+        if self._csr_rev is None:
+            self._csr_rev = self.csr.T.tocsr()
+        return self._csr_rev
     
     def afficher_graphe(self):
         """Affiche le graphe sous forme de triplets et la matrice"""
-        if not self.matrix:
+        if self.csr is None:
             print("Le graphe n'a pas encore été construit.")
             return
         
         print("\n*** Graphe d'ordonnancement ***")
         print(f"{self.n + 2} sommets (0 à {self.omega})")
         
-        # Compter le nombre d'arcs
-        arcs = []
-        for i in range(len(self.matrix)):
-            for j in range(len(self.matrix)):
-                if self.matrix[i][j] is not None:
-                    arcs.append((i, j, self.matrix[i][j]))
+        size = self.n + 2
+        indices, data = self.indices, self.data
+        
+        # Liste des arcs (origine, destination, valeur)
+        arcs = np.stack([self.rows, indices, data], axis=1)
         
         print(f"{len(arcs)} arcs")
         print("\nListe des arcs (triplets):")
-        for arc in arcs:
-            print(f"{arc[0]} -> {arc[1]} = {arc[2]}")
+        sys.stdout.write("".join(f"{i} -> {j} = {w}\n" for i, j, w in arcs.tolist()))
+        
+        # La matrice n'est lisible que pour les petits graphes
+        if size >= 50:
+            print("\nMatrice non affichée (50 sommets ou plus)")
+            return
         
         # Afficher la matrice
         print("\nMatrice des valeurs:")
-        size = len(self.matrix)
         
-        # En-tête des colonnes
-        print("   ", end="")
-        for j in range(size):
-            print(f"{j:4}", end="")
-        print()
+        # Cellules préremplies avec '*', seules les cases des arcs sont réécrites
+        cells = np.full((size, size), "   *", dtype=object)
+        cells[self.rows, indices] = [f"{w:4}" for w in data.tolist()]
         
-        # Lignes de la matrice
-        for i in range(size):
-            print(f"{i:2} ", end="")
-            for j in range(size):
-                val = self.matrix[i][j]
-                print(f"{'   *' if val is None else val:4}", end="")
-            print()
+        # En-tête des colonnes puis lignes de la matrice, écrites en une seule fois
+        lines = ["   " + "".join(f"{j:4}" for j in range(size))]
+        lines += [f"{i:2} " + "".join(cells[i]) for i in range(size)]
+        sys.stdout.write("\n".join(lines) + "\n")
     
     def verifier_proprietes(self):
         """Vérifie si le graphe est un graphe d'ordonnancement"""
-        if not self.matrix:
+        if self.csr is None:
             print("Le graphe n'a pas encore été construit.")
             return False
         
         print("\n*** Vérification des propriétés ***")
         
         # 1. Vérifier les arcs négatifs
-        has_negative = False
-        for i in range(len(self.matrix)):
-            for j in range(len(self.matrix)):
-                if self.matrix[i][j] is not None and self.matrix[i][j] < 0:
-                    has_negative = True
-                    break
+        has_negative = bool((self.data < 0).any())
         
         if has_negative:
             print("- Le graphe contient des arcs avec des valeurs négatives.")
@@ -133,107 +243,69 @@ class Ordonnancement:
         """Détecte un circuit dans le graphe en utilisant l'algorithme de Kahn"""
         print("\nDétection de circuit (méthode d'élimination des points d'entrée):")
         
-        # Créer une copie du graphe pour travailler
-        size = len(self.matrix)
-        in_degree = [0] * size
-        adj = [[] for _ in range(size)]
+        self._ensure_topo()
+        size = self.n + 2
+        topo = self._topo.tolist()
         
-        # Calculer le degré entrant et la liste d'adjacence
-        for i in range(size):
-            for j in range(size):
-                if self.matrix[i][j] is not None:
-                    adj[i].append(j)
-                    in_degree[j] += 1
-        
-        # File des sommets avec degré entrant 0
-        queue = deque([i for i in range(size) if in_degree[i] == 0])
-        count = 0
-        topo_order = []
-        
-        while queue:
-            print(f"\nPoints d'entrée: {list(queue)}")
-            u = queue.popleft()
-            topo_order.append(u)
-            
-            print(f"Suppression du point d'entrée {u}")
-            
-            for v in adj[u]:
-                in_degree[v] -= 1
-                if in_degree[v] == 0:
-                    queue.append(v)
-            
-            count += 1
-            
-            remaining = [i for i in range(size) if in_degree[i] > 0]
-            print(f"Sommets restants: {remaining if remaining else 'Aucun'}")
+        count = len(topo)
         
-        if count != size:
-            # Il y a un circuit, trouvons-le
-            visited = [False] * size
-            on_stack = [False] * size
-            path = []
+        if self.verbose:
+            # Rejouer l'élimination des points d'entrée à partir de l'ordre mis en cache
+            indptr, indices = self.indptr, self.indices
+            in_degree = np.bincount(indices, minlength=size).tolist()
+            tail = sum(1 for d in in_degree if d == 0)
             
-            def dfs(node):
-                visited[node] = True
-                on_stack[node] = True
-                path.append(node)
+            for k, u in enumerate(topo):
+                print(f"\nPoints d'entrée: {topo[k:tail]}")
+                print(f"Suppression du point d'entrée {u}")
                 
-                for neighbor in adj[node]:
-                    if not visited[neighbor]:
-                        if dfs(neighbor):
-                            return True
-                    elif on_stack[neighbor]:
-                        # Trouvé un circuit
-                        circuit_start = path.index(neighbor)
-                        return path[circuit_start:] + [neighbor]
+                for v in indices[indptr[u]:indptr[u + 1]].tolist():
+                    in_degree[v] -= 1
+                    if in_degree[v] == 0:
+                        tail += 1
                 
-                on_stack[node] = False
-                path.pop()
-                return False
+                remaining = [i for i in range(size) if in_degree[i] > 0]
+                print(f"Sommets restants: {remaining if remaining else 'Aucun'}")
+        else:
+            # Degrés entrants restants : arcs dont l'origine n'a pas été éliminée
+            removed = np.zeros(size, dtype=bool)
+            removed[self._topo] = True
+            in_degree = np.bincount(self.indices[~removed[self.rows]], minlength=size).tolist()
+        
+        if count != size:
+            # Il y a un circuit : les sommets restants (degré entrant > 0) ont tous un
+            # prédécesseur restant, en remontant ces prédécesseurs on retombe forcément
+            # sur un sommet déjà vu
+            rev = self._ensure_rev_csr()
+            cur = next(i for i in range(size) if in_degree[i] > 0)
+            walk = []
+            pos = {}
             
-            for node in range(size):
-                if not visited[node]:
-                    circuit = dfs(node)
-                    if circuit:
-                        return circuit
+            while cur not in pos:
+                pos[cur] = len(walk)
+                walk.append(cur)
+                preds = rev.indices[rev.indptr[cur]:rev.indptr[cur + 1]].tolist()
+                cur = next(p for p in preds if in_degree[p] > 0)
             
-            return []  # Ne devrait pas arriver si count != size
+            # La marche suit les arcs à l'envers : remettre le circuit dans le bon sens
+            circuit = walk[pos[cur]:][::-1]
+            return circuit + [circuit[0]]
         else:
             print("\n-> Il n'y a pas de circuit")
             return None
     
     def calculer_rangs(self):
         """Calcule les rangs des sommets du graphe"""
-        if not self.matrix:
+        if self.csr is None:
             print("Le graphe n'a pas encore été construit.")
             return None
         
         print("\n*** Calcul des rangs ***")
         
-        size = len(self.matrix)
-        ranks = [0] * size
-        
-        # Tri topologique
-        in_degree = [0] * size
-        adj = [[] for _ in range(size)]
-        
-        for i in range(size):
-            for j in range(size):
-                if self.matrix[i][j] is not None:
-                    adj[i].append(j)
-                    in_degree[j] += 1
-        
-        queue = deque([i for i in range(size) if in_degree[i] == 0])
-        
-        while queue:
-            u = queue.popleft()
-            
-            for v in adj[u]:
-                if ranks[v] < ranks[u] + 1:
-                    ranks[v] = ranks[u] + 1
-                in_degree[v] -= 1
-                if in_degree[v] == 0:
-                    queue.append(v)
+        # Rangs calculés avec le tri topologique
+        self._ensure_topo()
+        size = self.n + 2
+        ranks = self._ranks
         
         print("Rangs des sommets:")
         for i in range(size):
@@ -243,66 +315,27 @@ class Ordonnancement:
     
     def calculer_calendriers(self):
         """Calcule les calendriers au plus tôt et au plus tard"""
-        if not self.matrix:
+        if self.csr is None:
             print("Le graphe n'a pas encore été construit.")
             return None, None, None
         
         print("\n*** Calcul des calendriers ***")
         
-        size = len(self.matrix)
-        early = [0] * size
-        late = [float('inf')] * size
-        
-        # Calendrier au plus tôt (parcours dans l'ordre topologique)
-        in_degree = [0] * size
-        adj = [[] for _ in range(size)]
-        
-        for i in range(size):
-            for j in range(size):
-                if self.matrix[i][j] is not None:
-                    adj[i].append(j)
-                    in_degree[j] += 1
-        
-        queue = deque([i for i in range(size) if in_degree[i] == 0])
-        
-        while queue:
-            u = queue.popleft()
-            
-            for v in adj[u]:
-                if early[v] < early[u] + (self.matrix[u][v] if self.matrix[u][v] is not None else 0):
-                    early[v] = early[u] + (self.matrix[u][v] if self.matrix[u][v] is not None else 0)
-                in_degree[v] -= 1
-                if in_degree[v] == 0:
-                    queue.append(v)
+        # Calendrier au plus tôt (calculé avec le tri topologique)
+        self._ensure_topo()
+        size = self.n + 2
+        if len(self._topo) != size:
+            print("Le graphe contient un circuit : les calendriers ne peuvent pas être calculés.")
+            return None, None, None
+        early = self._early
         
         # Durée totale du projet
         total_duration = early[self.omega]
         print(f"\nDurée totale du projet: {total_duration}")
         
-        # Calendrier au plus tard (parcours inverse)
-        late[self.omega] = total_duration
-        
-        # Inverser le graphe
-        rev_adj = [[] for _ in range(size)]
-        rev_in_degree = [0] * size
-        
-        for i in range(size):
-            for j in range(size):
-                if self.matrix[i][j] is not None:
-                    rev_adj[j].append(i)
-                    rev_in_degree[i] += 1
-        
-        queue = deque([i for i in range(size) if rev_in_degree[i] == 0])
-        
-        while queue:
-            u = queue.popleft()
-            
-            for v in rev_adj[u]:
-                if late[v] > late[u] - (self.matrix[v][u] if self.matrix[v][u] is not None else 0):
-                    late[v] = late[u] - (self.matrix[v][u] if self.matrix[v][u] is not None else 0)
-                rev_in_degree[v] -= 1
-                if rev_in_degree[v] == 0:
-                    queue.append(v)
+        # Calendrier au plus tard (ordre topologique inverse sur le graphe inversé)
+        rev = self._ensure_rev_csr()
+        late = _late_from_topo(rev.indptr, rev.indices, rev.data, self._topo, self.omega, total_duration)
         
         print("\nCalendrier au plus tôt:")
         for i in range(size):
@@ -310,58 +343,75 @@ class Ordonnancement:
         
         print("\nCalendrier au plus tard:")
         for i in range(size):
-            print(f"Sommet {i}: {late[i]}")
+            print(f"Sommet {i}: {late[i] if late[i] < INFINI else 'inf'}")
         
         # Calcul des marges
-        margins = [late[i] - early[i] for i in range(size)]
+        margins = late - early
         print("\nMarges:")
         for i in range(size):
-            print(f"Sommet {i}: {margins[i]}")
+            print(f"Sommet {i}: {margins[i] if late[i] < INFINI else 'inf'}")
         
         return early, late, margins
     
     def trouver_chemins_critiques(self, early, late):
         """Trouve les chemins critiques du graphe"""
-        if not self.matrix or early is None or late is None:
+        if self.csr is None or early is None or late is None:
             print("Les calendriers n'ont pas encore été calculés.")
             return None
         
         print("\n*** Recherche des chemins critiques ***")
         
-        size = len(self.matrix)
+        size = self.n + 2
+        rows, cols, w = self.rows, self.indices, self.data
+        early, late = np.asarray(early), np.asarray(late)
         critical_paths = []
         
         # Trouver tous les arcs critiques (marge = 0)
-        critical_edges = []
-        for i in range(size):
-            for j in range(size):
-                if self.matrix[i][j] is not None and late[j] - early[i] - (self.matrix[i][j] if self.matrix[i][j] is not None else 0) == 0:
-                    critical_edges.append((i, j))
+        mask = (late[cols] - early[rows] - w) == 0
+        critical_edges = zip(rows[mask].tolist(), cols[mask].tolist())
         
         # Construire le graphe des arcs critiques
         adj = [[] for _ in range(size)]
         for u, v in critical_edges:
             adj[u].append(v)
         
-        # Trouver tous les chemins de α à ω dans ce graphe
-        def dfs(node, path, paths):
-            path.append(node)
+        # Nombre de chemins critiques issus de chaque sommet (ordre topologique inverse)
+        self._ensure_topo()
+        num_paths = [0] * size
+        num_paths[self.omega] = 1
+        for u in reversed(self._topo.tolist()):
+            for v in adj[u]:
+                num_paths[u] += num_paths[v]
+        
+        # Ne garder que les arcs menant à ω : chaque branche explorée produit un chemin
+        adj = [[v for v in adj[u] if num_paths[v]] for u in range(size)]
+        
+        # Trouver les chemins de α à ω dans ce graphe (pile explicite, nombre de chemins borné)
+        paths = []
+        path = [self.alpha]
+        stack = [iter(adj[self.alpha])]
+        
+        while stack and len(paths) < MAX_CHEMINS_CRITIQUES:
+            neighbor = next(stack[-1], None)
+            
+            if neighbor is None:
+                stack.pop()
+                path.pop()
+                continue
             
-            if node == self.omega:
+            path.append(neighbor)
+            if neighbor == self.omega:
                 paths.append(path.copy())
+                path.pop()
             else:
-                for neighbor in adj[node]:
-                    dfs(neighbor, path, paths)
-            
-            path.pop()
-        
-        paths = []
-        dfs(self.alpha, [], paths)
+                stack.append(iter(adj[neighbor]))
         
         if paths:
-            print("\nChemin(s) critique(s) trouvé(s):")
+            print(f"\nChemin(s) critique(s) trouvé(s): {num_paths[self.alpha]}")
             for path in paths:
                 print(" -> ".join(map(str, path)))
+            if num_paths[self.alpha] > len(paths):
+                print(f"(liste limitée aux {MAX_CHEMINS_CRITIQUES} premiers chemins)")
         else:
             print("\nAucun chemin critique trouvé.")
         
@@ -369,6 +419,7 @@ class Ordonnancement:
 
 def main():
     ordonnancement = Ordonnancement()
+    ordonnancement.verbose = "-v" in sys.argv[1:]
     
     print("=== Programme d'ordonnancement ===")
     
@@ -405,7 +456,7 @@ def main():
             ordonnancement.trouver_chemins_critiques(early, late)
         elif choix == "7":
             # Exécution complète
-            if not ordonnancement.tasks:
+            if not ordonnancement.n:
                 print("Veuillez d'abord charger un fichier de contraintes.")
                 continue
             